@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 '''Adapt list of "numbers" to HTML <OL> element.
 
 It is safe to do ``from listalyze import *``.  Only the
@@ -32,33 +32,30 @@ __all__ = [
 ]
 
 
-from copy import copy
-import string
+from itertools import islice
 
 
 # Converters for numbering schemes.
-def convert_decimal( number ):
-	return int( number )
-
+# The alphabetic converters walk a bytearray because iterating one
+# yields character codes as ints directly, with no ord() call per
+# character.
 def convert_lower_alpha( number ):
 	result = 0
-	for ch in number:
-		result *= 26
-		result += ord(ch) - ord('a') + 1
+	for code in bytearray( number, 'ascii' ):
+		result = result * 26 + code - 96      # ord('a') == 97
 	return result
 
 def convert_upper_alpha( number ):
 	result = 0
-	for ch in number:
-		result *= 26
-		result += ord(ch) - ord('A') + 1
+	for code in bytearray( number, 'ascii' ):
+		result = result * 26 + code - 64      # ord('A') == 65
 	return result
 
 def convert_mixed_alpha( number ):
 	return convert_upper_alpha( number.upper() )
 
 scheme_converters = {
-	u'decimal'     : convert_decimal,
+	u'decimal'     : int,      # Only ever given ASCII digits.
 	u'lower-alpha' : convert_lower_alpha,
 	u'upper-alpha' : convert_upper_alpha,
 	u'mixed-alpha' : convert_mixed_alpha,
@@ -67,14 +64,14 @@ scheme_converters = {
 
 # Character sets for numbering schemes.
 scheme_character_sets = {
-	u'decimal' : set( [unicode(ch) for ch in string.digits] ),
+	u'decimal' : frozenset( u'0123456789' ),
 	
-	u'lower-alpha' : set( [unicode(ch) for ch in string.ascii_lowercase] ),
+	u'lower-alpha' : frozenset( u'abcdefghijklmnopqrstuvwxyz' ),
 	
-	u'upper-alpha' : set( [unicode(ch) for ch in string.ascii_uppercase] ),
+	u'upper-alpha' : frozenset( u'ABCDEFGHIJKLMNOPQRSTUVWXYZ' ),
 	
-	u'mixed-alpha' : set( [unicode(ch) for ch in
-		(string.ascii_lowercase + string.ascii_uppercase)] ),
+	u'mixed-alpha' : frozenset( u'abcdefghijklmnopqrstuvwxyz'
+		u'ABCDEFGHIJKLMNOPQRSTUVWXYZ' ),
 }
 all_scheme_names = set( scheme_character_sets )
 
@@ -85,21 +82,35 @@ all_scheme_names = set( scheme_character_sets )
 #		See http://www.w3.org/TR/css3-lists/#list-content
 
 
-def categorize_number( number ):
+def categorize_number( number, mixed_case = True ):
 	'''Returns the set of number scheme names that the number
-	might be part of.
+	might be part of.  The mixed-alpha scheme is left out
+	unless `mixed_case` is true.
 	
 	For example, categorize_number( u'i' ) would return
 	set( [u'lower-alpha', u'lower-roman'] ) (assuming Roman
 	numerals were supported yet.)
+	
+	The tests are str predicates, each a single scan of the
+	string in C.  Once a number is known to be ASCII, they agree
+	exactly with `scheme_character_sets`.  New schemes must be
+	added here by hand.
 	'''
-	schemes = copy( all_scheme_names )
-	for scheme_name in scheme_character_sets:
-		charset = scheme_character_sets[scheme_name]
-		for ch in number:
-			if ch not in charset:
-				schemes.remove( scheme_name )
-				break
+	if not number.isascii():
+		return set()
+	if number.isdigit():
+		return set( [u'decimal'] )
+	if not number.isalpha():
+		return set()
+	if number.islower():
+		schemes = set( [u'lower-alpha'] )
+	elif number.isupper():
+		schemes = set( [u'upper-alpha'] )
+	else:
+		# Letters of both cases.
+		schemes = set()
+	if mixed_case:
+		schemes.add( u'mixed-alpha' )
 	return schemes
 
 
@@ -152,8 +163,10 @@ def listalyze( numbers, require_dot = True, mixed_case = False ):
         CSS 2.1 ``list-style-type`` property:
         http://www.w3.org/TR/CSS21/generate.html#propdef-list-style-type
     
-    `value_list` is a list of the numbers (raw or converted) as
-    described above.  These are always unicode strings.
+    `value_list` is a new list of the numbers (raw or converted)
+    as described above.  It holds only the caller's unicode
+    strings if `numbering_type` is ``None`` and only ints
+    otherwise.
     
     `default_order` is True if the `numbers` were a recognized
     type of ordinal and run from the default CSS 2.1 starting
@@ -166,7 +179,7 @@ def listalyze( numbers, require_dot = True, mixed_case = False ):
     Example usage:
         >>> from listalyze import *
         >>> listalyze( [u'A.', u'B.', u'D.'] )
-        (u'upper-alpha', [1, 2, 4], False)
+        ('upper-alpha', [1, 2, 4], False)
     
     This example might be turned into this HTML:
         <OL STYLE="list-style-type: upper-alpha;">
@@ -193,56 +206,66 @@ def listalyze( numbers, require_dot = True, mixed_case = False ):
     ``http://www.w3.org/TR/CSS21/generate.html#propdef-list-style-type``.
 '''
 	# Make list from `numbers` iterable.
-	numbers_list = []
 	try:
-		numbers_list = [N for N in numbers]
+		numbers_list = list( numbers )
 	except TypeError:
 		raise TypeError( '\'%s\' object is not iterable ("numbers" parameter)' %
 			type( numbers ).__name__ )
 	
-	nl_iter = xrange( len( numbers_list ) )
-	raw_numbers_list = copy( numbers_list )
-	
 	# Value to return when we don't recognize the numbering scheme.
-	dont_recognize_scheme = (None, raw_numbers_list, False)
-	
-	# Only accept unicode strings.  This is to keep non-unicode stuff
-	# from making it to an HTML generator.
-	for i in nl_iter:
-		number = numbers_list[i]
-		if type(number) is not unicode:
+	dont_recognize_scheme = (None, numbers_list, False)
+	
+	# Check, strip, and de-dot each number in a single pass.  A badly
+	# dotted number only marks the list as unrecognized, so that the type
+	# check still covers every item.
+	stripped_list = []
+	dots_ok = True
+	for i, number in enumerate( numbers_list ):
+		# Only accept unicode strings.  This is to keep non-unicode stuff
+		# from making it to an HTML generator.
+		if type(number) is not str:
 			raise TypeError( '\'%s\' object is not a unicode string '\
 				'(item with index %d returned from "numbers" iterable)' %
 				(type( number ).__name__, i) )
-		numbers_list[i] = number.strip()
-	
-	if require_dot:
-		# Require a trailing dot on each number, and strip 'em all off.
-		for i in nl_iter:
-			number = numbers_list[i]
-			if (len( number ) < 2) or (number[-1] != u'.'):
-				return dont_recognize_scheme
-			numbers_list[i] = number[:-1]
-	else:
-		# Strip trailing dots if they are there, otherwise do nothing.
-		for i in nl_iter:
-			if len( numbers_list[i] ) < 1:
-				return dont_recognize_scheme
-			if numbers_list[i][-1] == u'.':
-				numbers_list[i] = numbers_list[i][:-1]
-			if numbers_list[i] == u'':
-				return dont_recognize_scheme
+		if not dots_ok:
+			continue
+		number = number.strip()
+		if require_dot:
+			# Require a trailing dot on each number, and strip 'em all off.
+			if (len( number ) < 2) or not number.endswith( u'.' ):
+				dots_ok = False
+				continue
+			number = number[:-1]
+		else:
+			# Strip trailing dots if they are there, otherwise do nothing.
+			if number.endswith( u'.' ):
+				number = number[:-1]
+			if number == u'':
+				dots_ok = False
+				continue
+		stripped_list.append( number )
+	if not dots_ok:
+		return dont_recognize_scheme
 	
 	# Categorize numbers and find set of schemes that matches them all.
-	number_schemes = copy( all_scheme_names )
-	for number in numbers_list:
+	# The categorizer is bound to a local to skip a global lookup per
+	# number.
+	categorize = categorize_number
+	number_schemes = set( all_scheme_names )
+	for i, number in enumerate( stripped_list ):
 		# "&" means intersection for sets.
-		number_schemes &= categorize_number( number )
-	
-	# If mixed-case support is turned off, filter out mixed case schemes.
-	if not mixed_case:
-		if u'mixed-alpha' in number_schemes:
-			number_schemes.remove( u'mixed-alpha' )
+		number_schemes &= categorize( number, mixed_case )
+		if not number_schemes:
+			return dont_recognize_scheme
+		if len( number_schemes ) == 1:
+			# Only one candidate left, so the remaining numbers just have
+			# to fit its character set.  all() and map() run that check
+			# over the rest of the list without an interpreted loop.
+			charset = scheme_character_sets[next( iter( number_schemes ) )]
+			if not all( map( charset.issuperset,
+					islice( stripped_list, i + 1, None ) ) ):
+				return dont_recognize_scheme
+			break
 	
 	# Don't use the mixed-alpha numbering scheme if an alternative scheme
 	# matches.
@@ -254,21 +277,22 @@ def listalyze( numbers, require_dot = True, mixed_case = False ):
 	if len( number_schemes ) != 1:
 		return dont_recognize_scheme
 	
-	# Convert numbers
-	scheme = list(number_schemes)[0]
+	# Convert numbers.  map() drives the whole batch from C instead of
+	# an interpreted loop, which pays off on long lists.
+	scheme = next( iter( number_schemes ) )
 	converter = scheme_converters[scheme]
-	default_order = True
-	for i in nl_iter:
-		numbers_list[i] = converter( numbers_list[i] )
-		if numbers_list[i] != i + 1:
-			default_order = False
+	value_list = list( map( converter, stripped_list ) )
+	
+	# Default order means the values run 1, 2, 3, ... with no gaps; one
+	# list comparison checks that in C.
+	default_order = (value_list == list( range( 1, len( value_list ) + 1 ) ))
 	
 	# Force mixed-case numbering schemes to upper case.  (It looks good
 	# and saves work for the 99.9% of callers who don't care.)
 	if scheme == u'mixed-alpha':
 		scheme = u'upper-alpha'
 	
-	return (scheme, numbers_list, default_order)
+	return (scheme, value_list, default_order)
 
 
 # Test the code.
@@ -276,21 +300,21 @@ if __name__ == "__main__":
 	import sys
 	
 	def fail( msg ):
-		print 'Test failure:', msg
+		print( 'Test failure:', msg )
 		sys.exit( 1 )
 		
-	print 'Testing listalyzer.py ...'
+	print( 'Testing listalyzer.py ...' )
 	
 	try:
 		listalyze( 14 )
-	except TypeError, err:
+	except TypeError as err:
 		pass
 	else:
 		fail( 'accepted non-iterator "numbers"' )
 	
 	try:
-		listalyze( [u'1', '2', u'3'] )
-	except TypeError, err:
+		listalyze( [u'1', b'2', u'3'] )
+	except TypeError as err:
 		pass
 	else:
 		fail( 'accepted non-Unicode number.' )
@@ -335,10 +359,10 @@ if __name__ == "__main__":
 	if result[2] != False:
 		fail( 'failed to recognize numbers in non-canonical order' )
 	
-	result = listalyze( [unicode(chr(ord('a') + i)) for i in xrange(26)] +
+	result = listalyze( [chr(ord('a') + i) for i in range(26)] +
 		[u'aa', u'ab'],
 		False )
-	if result[1] != [i + 1 for i in xrange( 28 )]:
+	if result[1] != [i + 1 for i in range( 28 )]:
 		fail( 'failed to convert uppercase letters accurately' )
 	if result[2] != True:
 		fail( 'failed to recognize numbers in canonical order' )
@@ -355,6 +379,14 @@ if __name__ == "__main__":
 	if result[0] != None:
 		fail( 'improperly accepted mixed scheme numbers' )
 	
+	result = listalyze( [u'1', u'2', u'3', u'4x'], False )
+	if result[0] != None:
+		fail( 'improperly accepted mixed scheme numbers' )
+	
+	result = listalyze( [u'\u00b2.', u'\u00e9.'] )
+	if result[0] != None:
+		fail( 'improperly accepted non-ASCII digit or letter' )
+	
 	result = listalyze( [u'a.', u'B.'], mixed_case = False )
 	if result[0] != None:
 		fail( 'improperly accepted mixed case alphabetic numbering' )
@@ -363,8 +395,8 @@ if __name__ == "__main__":
 	if result[0] != u'upper-alpha':
 		fail( 'improperly rejected mixed case alphabetic numbering' )
 	
-	print 'Tests successful.'
-	print 'Exiting.'
+	print( 'Tests successful.' )
+	print( 'Exiting.' )
 	
 	sys.exit( 0 )
 